@@ -6,18 +6,21 @@ jAccount 登录管理模块
 """
 
 import os
-import json
+import re
 import time
+import heapq
+import itertools
 import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import cookiejar_from_dict
+from urllib3.util.retry import Retry
 from pathlib import Path
-from typing import Dict, Any, Optional, Union, Tuple, Callable
+from typing import Dict, Any, List, Optional, Union, Tuple, Callable
 import logging
-from PIL import Image
-import io
 import threading
 import urllib.parse
-from bs4 import BeautifulSoup
-from getpass4 import getpass
+
+from . import json_utils
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -28,31 +31,164 @@ DEFAULT_INITIAL_URL = "https://my.sjtu.edu.cn/api/account"
 # 登录状态验证 URL，用于检查是否已登录
 LOGIN_CHECK_URL = "https://my.sjtu.edu.cn/api/account"
 
+# jAccount 相关接口地址
+JACCOUNT_LOGIN_URL = "https://jaccount.sjtu.edu.cn/jaccount/jalogin"
+CAPTCHA_URL = "https://jaccount.sjtu.edu.cn/jaccount/captcha"
+ULOGIN_URL = "https://jaccount.sjtu.edu.cn/jaccount/ulogin"
+LOGOUT_URL = "https://jaccount.sjtu.edu.cn/jaccount/logout"
+
+# 判断跳转目标是否为登录页时使用的子串，不含协议，以兼容 http、协议相对等形式的跳转
+_JALOGIN_MARKER = "jaccount.sjtu.edu.cn/jaccount/jalogin"
+
+# 会话默认使用的浏览器 User-Agent
+DEFAULT_UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36"
+
+# 获取验证码时额外携带的请求头
+_CAPTCHA_HEADERS = {"Referer": CAPTCHA_URL}
+
+# 用于认证的 Cookie 名称（小写）
+_AUTH_COOKIE_KEYS = frozenset({"jaauthcookie", "jsessionid", "castgc"})
+
+# 常见图片格式的文件头及对应扩展名，用于识别验证码图片格式
+_IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"GIF8", ".gif"),
+)
+
 # Cookie 有效期检查间隔（秒）
 COOKIE_CHECK_INTERVAL = 300  # 5分钟检查一次
 
+# 登录状态检查结果的缓存时间（秒）
+LOGIN_STATE_TTL = 30
+
+# 登录页面中 UUID 的常见位置：firefox_link 链接、uuid 隐藏字段、JavaScript 变量
+_UUID_CONTEXT_RE = re.compile(
+    r'(?:id=["\']firefox_link["\'][^>]*?href=["\'][^"\']*?='
+    r'|name=["\']uuid["\'][^>]*?value=["\']'
+    r'|var\s+uuid\s*=\s*["\'])'
+    r'([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})'
+)
+
+# JavaScript 中 uuid 变量的赋值（不限定取值格式）
+_UUID_VAR_RE = re.compile(r'var\s+uuid\s*=\s*["\']?([^"\';\s]+)')
+
+# 任意 UUID 格式的字符串
+_UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+
+
+class _Scheduler:
+    """
+    周期任务调度器
+
+    所有 JAccountLogin 实例共享同一个后台线程，按截止时间派发注册的周期任务。
+    回调在单独的守护线程中执行（可能阻塞在交互式重新登录上），不会拖住其他任务的调度；
+    同一任务上一次执行结束后才会重新计时，不会重叠执行。
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[float, int]] = []  # (截止时间, 任务 ID)
+        self._jobs: Dict[int, Tuple[float, Callable[[], None]]] = {}  # 任务 ID -> (间隔, 回调)
+        self._ids = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule_periodic(self, interval: float, callback: Callable[[], None]) -> int:
+        """
+        注册周期任务，首次执行在 interval 秒之后
+
+        参数:
+            interval: 执行间隔（秒）
+            callback: 要执行的回调函数
+
+        返回:
+            任务 ID，可用于 cancel
+        """
+        with self._cond:
+            job_id = next(self._ids)
+            self._jobs[job_id] = (interval, callback)
+            heapq.heappush(self._heap, (time.monotonic() + interval, job_id))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="jaccount-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return job_id
+
+    def cancel(self, job_id: int) -> None:
+        """取消周期任务，正在执行的任务结束后不会再次被调度"""
+        with self._cond:
+            self._jobs.pop(job_id, None)
+            self._cond.notify()
+
+    def _run(self) -> None:
+        """调度线程主循环"""
+        while True:
+            with self._cond:
+                while True:
+                    # 丢弃已取消任务残留在堆中的条目
+                    while self._heap and self._heap[0][1] not in self._jobs:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    deadline, job_id = self._heap[0]
+                    delay = deadline - time.monotonic()
+                    if delay <= 0:
+                        heapq.heappop(self._heap)
+                        break
+                    self._cond.wait(delay)
+                interval, callback = self._jobs[job_id]
+
+            threading.Thread(
+                target=self._execute,
+                args=(job_id, interval, callback),
+                name=f"jaccount-job-{job_id}",
+                daemon=True
+            ).start()
+
+    def _execute(self, job_id: int, interval: float, callback: Callable[[], None]) -> None:
+        """执行一次周期任务，结束后重新计时"""
+        try:
+            callback()
+        except Exception as e:
+            logger.error("执行周期任务时出错: %s", e)
+
+        with self._cond:
+            if job_id in self._jobs:
+                heapq.heappush(self._heap, (time.monotonic() + interval, job_id))
+                self._cond.notify()
+
+
+# 模块级共享的调度器
+_scheduler = _Scheduler()
+
 
 class JAccountLoginManager:
     """
     jAccount 登录管理器单例类
 
     该类负责全局管理 jAccount 登录状态和会话，确保系统中只有一个登录管理实例。
+    实例的创建采用双重检查加锁，多线程并发调用时也只会初始化一次。
     """
-    _instance = None
+    _instance: Optional["JAccountLogin"] = None
+    _lock = threading.Lock()
 
     @classmethod
-    def get_instance(cls, config_path: Optional[Union[str, Path]] = None):
+    def get_instance(cls, config_path: Optional[Union[str, Path]] = None) -> "JAccountLogin":
         """
-        获取 JAccountLoginManager 单例实例
+        获取全局唯一的 JAccountLogin 实例
 
         参数:
-            config_path: Cookie 配置文件路径，如果为 None 则使用默认路径
+            config_path: Cookie 配置文件路径，如果为 None 则使用默认路径。
+                仅在首次调用（实例尚未创建）时生效，之后的调用会忽略该参数。
 
         返回:
-            JAccountLoginManager 单例实例
+            JAccountLogin 单例实例
         """
         if cls._instance is None:
-            cls._instance = JAccountLogin(config_path)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = JAccountLogin(config_path)
         return cls._instance
 
 
@@ -64,6 +200,10 @@ class JAccountLogin:
     支持账号密码登录，并能够持久化保存登录会话。
     """
 
+    # Cookie 文件解析缓存: 配置文件路径 -> (st_mtime_ns, Cookie 字典)
+    _cookie_cache: Dict[Path, Tuple[int, Dict[str, str]]] = {}
+    _cookie_cache_lock = threading.Lock()
+
     def __init__(self, config_path: Optional[Union[str, Path]] = None):
         """
         初始化 jAccount 登录管理器
@@ -73,6 +213,24 @@ class JAccountLogin:
         """
         self.session = requests.Session()
 
+        # 复用连接池并对网关类错误做有限重试，减少重复的 TCP/TLS 握手
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.2,
+                status_forcelist=[502, 503, 504],
+                raise_on_status=False
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": DEFAULT_UA,
+            "Accept-Language": "zh-CN",
+            "Connection": "keep-alive"
+        })
+
         # 设置默认配置路径
         if config_path is None:
             # 使用相对于当前文件的路径
@@ -91,39 +249,54 @@ class JAccountLogin:
         self._load_cookies()
 
         # 会话状态监控
-        self._session_monitor_thread = None
-        self._session_monitor_stop = False
+        self._monitor_job: Optional[int] = None
         self._login_callback = None
-        self._last_check_time = 0
+
+        # 登录状态检查结果缓存: (检查时间, 是否已登录)
+        self._login_state_cache: Optional[Tuple[float, bool]] = None
+        self._login_state_lock = threading.Lock()
 
     def _save_cookies(self) -> None:
-        """保存会话 Cookie 到配置文件"""
+        """保存会话 Cookie 到配置文件（先写临时文件再原子替换）"""
         if self.cookies:
             try:
-                with open(self.config_path, 'w') as f:
-                    json.dump(self.cookies, f)
-                logger.info(f"Cookie 已保存到 {self.config_path}")
+                tmp_path = self.config_path.with_name(self.config_path.name + ".tmp")
+                with JAccountLogin._cookie_cache_lock:
+                    tmp_path.write_bytes(json_utils.dumps(self.cookies))
+                    os.replace(tmp_path, self.config_path)
+                    # 同步更新解析缓存，避免下次加载时重新读取刚写入的文件
+                    mtime_ns = os.stat(self.config_path).st_mtime_ns
+                    JAccountLogin._cookie_cache[self.config_path] = (mtime_ns, self.cookies.copy())
+                logger.info("Cookie 已保存到 %s", self.config_path)
             except Exception as e:
-                logger.error(f"保存 Cookie 时出错: {e}")
+                logger.error("保存 Cookie 时出错: %s", e)
 
     def _load_cookies(self) -> None:
-        """从配置文件加载会话 Cookie"""
+        """从配置文件加载会话 Cookie，文件未变化时直接复用已解析的结果"""
         try:
-            if self.config_path.exists():
-                with open(self.config_path, 'r') as f:
-                    self.cookies = json.load(f)
-                    # 直接更新会话的 cookies 字典，而不是使用 update 方法
-                    for key, value in self.cookies.items():
-                        self.session.cookies.set(key, value)
-                    logger.info(f"Cookie 已从 {self.config_path} 加载")
-            else:
-                logger.info(f"Cookie 文件 {self.config_path} 不存在，创建新会话")
+            try:
+                mtime_ns = os.stat(self.config_path).st_mtime_ns
+            except FileNotFoundError:
+                logger.info("Cookie 文件 %s 不存在，创建新会话", self.config_path)
                 self.cookies = None
-        except json.JSONDecodeError:
-            logger.error(f"解析 Cookie 文件 {self.config_path} 时出错，创建新会话")
+                return
+
+            with JAccountLogin._cookie_cache_lock:
+                cached = JAccountLogin._cookie_cache.get(self.config_path)
+                if cached is not None and cached[0] == mtime_ns:
+                    self.cookies = cached[1].copy()
+                else:
+                    self.cookies = json_utils.loads(self.config_path.read_bytes())
+                    JAccountLogin._cookie_cache[self.config_path] = (mtime_ns, self.cookies.copy())
+
+            # 一次性构建 CookieJar，避免逐个 set 时反复创建 Cookie 对象
+            self.session.cookies = cookiejar_from_dict(self.cookies)
+            logger.info("Cookie 已从 %s 加载", self.config_path)
+        except json_utils.JSONDecodeError:
+            logger.error("解析 Cookie 文件 %s 时出错，创建新会话", self.config_path)
             self.cookies = None
         except Exception as e:
-            logger.error(f"加载 Cookie 时出错: {e}")
+            logger.error("加载 Cookie 时出错: %s", e)
             self.cookies = None
 
     def _parse_params(self, url: str) -> Dict[str, str]:
@@ -136,15 +309,54 @@ class JAccountLogin:
         返回:
             包含查询参数的字典
         """
+        # 保持与 unquote 相同的语义（不把 '+' 解码为空格），避免破坏 base64 形式的参数值
         params = {}
-        if '?' in url:
-            query_string = url.split('?', 1)[1]
-            for param in query_string.split('&'):
-                if '=' in param:
-                    key, value = param.split('=', 1)
-                    params[urllib.parse.unquote(key)] = urllib.parse.unquote(value)
+        for param in urllib.parse.urlsplit(url).query.split('&'):
+            key, sep, value = param.partition('=')
+            if sep:
+                params[urllib.parse.unquote(key)] = urllib.parse.unquote(value)
         return params
 
+    def _extract_uuid_from_html(self, page_text: str) -> Optional[str]:
+        """
+        使用 BeautifulSoup 从登录页面中提取 UUID，仅在正则快速匹配失败时调用
+
+        参数:
+            page_text: 登录页面的 HTML 文本
+
+        返回:
+            UUID 字符串，未找到时返回 None
+        """
+        # 仅在回退路径中用到，延迟导入以减少模块加载时间
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(page_text, 'html.parser')
+
+        # 方法1: 通过 firefox_link
+        firefox_link = soup.find('a', attrs={'id': 'firefox_link'})
+        if firefox_link and 'href' in firefox_link.attrs:
+            href = firefox_link['href']
+            if '=' in href and href.split('=')[1]:
+                return href.split('=')[1]
+
+        # 方法2: 通过 input 字段
+        uuid_input = soup.find('input', attrs={'name': 'uuid'})
+        if uuid_input and uuid_input.get('value'):
+            return uuid_input['value']
+
+        # 方法3: 通过 JavaScript 变量，合并所有脚本文本后用一次正则匹配
+        all_js = "\n".join(script.string for script in soup.find_all('script') if script.string)
+        match = _UUID_VAR_RE.search(all_js)
+        if match:
+            return match.group(1)
+
+        # 方法4: 直接从页面内容中查找 UUID 格式的字符串
+        match = _UUID_RE.search(page_text)
+        if match:
+            return match.group(0)
+
+        return None
+
     def _get_login_params(self, initial_url: str = DEFAULT_INITIAL_URL) -> Tuple[Dict[str, str], str, str]:
         """
         获取 jAccount 登录所需的参数
@@ -157,84 +369,61 @@ class JAccountLogin:
         """
         try:
             # 访问初始 URL，触发重定向到 jAccount 登录页面
-            response = self.session.get(
-                initial_url,
-                headers={"accept-language": "zh-CN"},
-                allow_redirects=True
-            )
+            response = self.session.get(initial_url, allow_redirects=True)
 
             # 解析登录页面 URL 中的参数
             login_url = response.url
             login_params = self._parse_params(login_url)
 
-            # 从页面内容中提取 UUID
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # 尝试多种方式提取 UUID
-            uuid = None
-
-            # 方法1: 通过 firefox_link
-            firefox_link = soup.find('a', attrs={'id': 'firefox_link'})
-            if firefox_link and 'href' in firefox_link.attrs:
-                href = firefox_link['href']
-                if '=' in href:
-                    uuid = href.split('=')[1]
-
-            # 方法2: 通过 input 字段
-            if not uuid:
-                uuid_input = soup.find('input', attrs={'name': 'uuid'})
-                if uuid_input and 'value' in uuid_input.attrs:
-                    uuid = uuid_input['value']
-
-            # 方法3: 通过 URL 参数
-            if not uuid and 'uuid' in login_params:
+            if login_params.get('uuid'):
+                # 重定向后的 URL 中已带有 UUID（最常见的情况），无需解码和扫描页面
                 uuid = login_params['uuid']
+                logger.debug("已从登录页面 URL 中获取 UUID")
+            else:
+                # requests 每次访问 response.text 都会重新解码，这里只解码一次
+                page_text = response.text
 
-            # 方法4: 通过 JavaScript 变量
-            if not uuid:
-                scripts = soup.find_all('script')
-                for script in scripts:
-                    if script.string and 'var uuid' in script.string:
-                        for line in script.string.split('\n'):
-                            if 'var uuid' in line and '=' in line:
-                                uuid_part = line.split('=')[1].strip()
-                                uuid = uuid_part.strip('"').strip("'").strip(';')
-                                break
-
-            if not uuid:
-                # 尝试直接从页面内容中查找 UUID 格式的字符串
-                import re
-                uuid_pattern = r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}'
-                uuid_matches = re.findall(uuid_pattern, response.text)
-                if uuid_matches:
-                    uuid = uuid_matches[0]
+                # 优先用预编译的正则直接在页面文本中定位 UUID，未命中时才解析页面
+                match = _UUID_CONTEXT_RE.search(page_text)
+                if match:
+                    uuid = match.group(1)
+                else:
+                    uuid = self._extract_uuid_from_html(page_text)
 
             if not uuid:
                 # 如果仍然无法提取 UUID，则尝试使用固定的登录 URL
                 logger.warning("无法从页面提取 UUID，尝试使用固定的登录 URL")
-                login_url = "https://jaccount.sjtu.edu.cn/jaccount/jalogin"
+                login_url = JACCOUNT_LOGIN_URL
                 login_params = {}
                 uuid = ""
             else:
-                logger.info(f"已获取登录参数: {login_params}")
-                logger.info(f"已获取 UUID: {uuid}")
+                logger.debug("已获取登录参数: %s", login_params)
+                logger.info("已获取 UUID: %s", uuid)
 
             return login_params, uuid, login_url
 
         except Exception as e:
-            logger.error(f"获取登录参数时出错: {e}")
+            logger.error("获取登录参数时出错: %s", e)
             raise
 
     def is_logged_in(self) -> bool:
         """
         检查当前会话是否已登录
 
+        明确的检查结果会缓存 LOGIN_STATE_TTL 秒，登录、登出时缓存会被清除。
+
         返回:
             如果已登录则返回 True，否则返回 False
         """
         if not self.cookies:
             return False
 
+        # 短时间内重复检查时直接复用上一次的结果，避免重复请求
+        with self._login_state_lock:
+            cached = self._login_state_cache
+        if cached is not None and time.monotonic() - cached[0] < LOGIN_STATE_TTL:
+            return cached[1]
+
         try:
             # 访问登录状态验证 URL
             response = self.session.get(
@@ -249,22 +438,34 @@ class JAccountLogin:
                     data = response.json()
                     if data.get("errno") == 0 and data.get("error") == "success":
                         logger.info("会话已登录")
+                        self._set_login_state(True)
                         return True
                 except ValueError:
                     pass
 
             # 如果状态码是 302 且重定向到登录页面，则未登录
-            if response.status_code == 302 and "jaccount.sjtu.edu.cn/jaccount/jalogin" in response.headers.get("Location", ""):
+            if response.status_code == 302 and _JALOGIN_MARKER in response.headers.get("Location", ""):
                 logger.info("会话未登录")
+                self._set_login_state(False)
                 return False
 
             logger.info("会话未登录或状态不明确")
             return False
 
         except Exception as e:
-            logger.error(f"检查登录状态时出错: {e}")
+            logger.error("检查登录状态时出错: %s", e)
             return False
 
+    def _set_login_state(self, logged_in: bool) -> None:
+        """记录登录状态检查结果"""
+        with self._login_state_lock:
+            self._login_state_cache = (time.monotonic(), logged_in)
+
+    def invalidate_login_cache(self) -> None:
+        """清除缓存的登录状态，下次调用 is_logged_in 时会重新检查"""
+        with self._login_state_lock:
+            self._login_state_cache = None
+
     def login_with_password(self, username: str, password: str, initial_url: str = DEFAULT_INITIAL_URL) -> bool:
         """
         使用账号密码登录 jAccount
@@ -277,50 +478,35 @@ class JAccountLogin:
         返回:
             登录成功返回 True，否则返回 False
         """
-        logger.info(f"尝试使用密码登录账号: {username}")
+        logger.info("尝试使用密码登录账号: %s", username)
+        self.invalidate_login_cache()
 
         try:
             # 获取登录参数
             login_params, uuid, login_url = self._get_login_params(initial_url)
 
             # 获取验证码图片
-            captcha_url = "https://jaccount.sjtu.edu.cn/jaccount/captcha"
             captcha_params = {
                 "uuid": uuid,
                 "t": time.time_ns() #int(time.time() * 1000)
             }
 
             captcha_response = self.session.get(
-                captcha_url,
+                CAPTCHA_URL,
                 params=captcha_params,
-                headers={"Referer": captcha_url, "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36"},
+                headers=_CAPTCHA_HEADERS,
                 timeout=10
             )
 
-            # 保存验证码图片到临时文件
-            try:
-                # 先将验证码保存为文件，然后再用 PIL 打开，避免直接从内存打开可能的格式问题
-                captcha_temp_path = self.cache_dir / f"captcha_temp_{int(time.time())}.png"
-                with open(captcha_temp_path, "wb") as f:
-                    f.write(captcha_response.content)
-
-                # 使用 PIL 打开保存的图片文件
-                captcha_img = Image.open(captcha_temp_path)
-                captcha_path = self.cache_dir / f"captcha_{int(time.time())}.png"
-                captcha_img.save(captcha_path)
-
-                # 删除临时文件
-                if captcha_temp_path.exists():
-                    captcha_temp_path.unlink()
-
-                print(f"验证码图片已保存到: {captcha_path}")
-            except Exception as e:
-                logger.error(f"处理验证码图片时出错: {e}")
-                # 如果 PIL 处理失败，直接保存原始内容
-                captcha_path = self.cache_dir / f"captcha_raw_{int(time.time())}.png"
-                with open(captcha_path, "wb") as f:
-                    f.write(captcha_response.content)
-                print(f"验证码图片已保存到: {captcha_path}")
+            # 直接保存验证码原始内容，仅根据文件头判断图片格式，无需解码
+            content = captcha_response.content
+            suffix = next((ext for sig, ext in _IMAGE_SIGNATURES if content.startswith(sig)), None)
+            if suffix is None:
+                logger.warning("验证码图片格式无法识别，按原始内容保存")
+                suffix = ".png"
+            captcha_path = self.cache_dir / f"captcha_{time.time_ns()}{suffix}"
+            captcha_path.write_bytes(content)
+            print(f"验证码图片已保存到: {captcha_path}")
 
             captcha = input("请输入验证码: ")
 
@@ -334,29 +520,27 @@ class JAccountLogin:
             }
 
             login_response = self.session.post(
-                "https://jaccount.sjtu.edu.cn/jaccount/ulogin",
+                ULOGIN_URL,
                 data=login_data,
-                headers={"accept-language": "zh-CN"},
                 allow_redirects=True,
                 timeout=10
             )
 
             # 检查登录是否成功
-            if "jaccount.sjtu.edu.cn/jaccount/jalogin" in login_response.url:
+            if _JALOGIN_MARKER in login_response.url:
                 logger.error("登录失败，可能是用户名、密码或验证码错误")
                 return False
 
             # 保存 Cookie - 使用字典序列化而不是直接使用 session.cookies
-            self.cookies = {}
-            for cookie in self.session.cookies:
-                self.cookies[cookie.name] = cookie.value
+            self.cookies = requests.utils.dict_from_cookiejar(self.session.cookies)
 
             self._save_cookies()
+            self.invalidate_login_cache()
             logger.info("密码登录成功")
             return True
 
         except Exception as e:
-            logger.error(f"密码登录过程中发生错误: {e}")
+            logger.error("密码登录过程中发生错误: %s", e)
             return False
 
     def logout(self) -> bool:
@@ -368,22 +552,24 @@ class JAccountLogin:
         """
         try:
             # 访问登出 URL
-            logout_url = "https://jaccount.sjtu.edu.cn/jaccount/logout"
-            self.session.get(logout_url, allow_redirects=True, timeout=10)
+            self.session.get(LOGOUT_URL, allow_redirects=True, timeout=10)
 
             # 清除会话和 Cookie
             self.cookies = None
             self.session.cookies.clear()
+            self.invalidate_login_cache()
 
             # 删除 Cookie 文件
-            if self.config_path.exists():
-                self.config_path.unlink()
-                logger.info(f"已删除 Cookie 文件: {self.config_path}")
+            with JAccountLogin._cookie_cache_lock:
+                JAccountLogin._cookie_cache.pop(self.config_path, None)
+                if self.config_path.exists():
+                    self.config_path.unlink()
+                    logger.info("已删除 Cookie 文件: %s", self.config_path)
 
             logger.info("已成功登出")
             return True
         except Exception as e:
-            logger.error(f"登出过程中发生错误: {e}")
+            logger.error("登出过程中发生错误: %s", e)
             return False
 
     def get_session(self) -> requests.Session:
@@ -415,78 +601,50 @@ class JAccountLogin:
             return ""
 
         # 提取关键认证 Cookie，例如 JAAuthCookie
-        auth_cookies = []
-        for key, value in self.cookies.items():
-            if key.lower() in ["jaauthcookie", "jsessionid", "castgc"]:
-                auth_cookies.append(f"{key}={value}")
-
-        return "; ".join(auth_cookies)
+        return "; ".join(
+            f"{key}={value}" for key, value in self.cookies.items() if key.lower() in _AUTH_COOKIE_KEYS
+        )
 
     def start_session_monitor(self, login_callback: Optional[Callable[[], None]] = None) -> None:
         """
-        启动会话状态监控线程
+        启动会话状态监控
 
-        该方法启动一个后台线程，定期检查会话状态，确保登录状态持续有效。
+        该方法在共享的后台调度线程中注册周期任务，定期检查会话状态，确保登录状态持续有效。
         如果检测到会话失效，将调用登录回调函数。
 
         参数:
             login_callback: 会话失效时的回调函数，用于触发重新登录
         """
-        if self._session_monitor_thread and self._session_monitor_thread.is_alive():
-            logger.info("会话监控线程已在运行")
+        if self._monitor_job is not None:
+            logger.info("会话监控已在运行")
             return
 
         self._login_callback = login_callback
-        self._session_monitor_stop = False
-        self._session_monitor_thread = threading.Thread(
-            target=self._session_monitor_task,
-            daemon=True
-        )
-        self._session_monitor_thread.start()
+        self._monitor_job = _scheduler.schedule_periodic(COOKIE_CHECK_INTERVAL, self._check_session)
         logger.info("已启动会话状态监控")
 
     def stop_session_monitor(self) -> None:
-        """停止会话状态监控线程"""
-        if self._session_monitor_thread and self._session_monitor_thread.is_alive():
-            self._session_monitor_stop = True
-            self._session_monitor_thread.join(timeout=2)
+        """停止会话状态监控"""
+        if self._monitor_job is not None:
+            _scheduler.cancel(self._monitor_job)
+            self._monitor_job = None
             logger.info("已停止会话状态监控")
 
-    def _session_monitor_task(self) -> None:
-        """会话状态监控任务"""
-        logger.info("会话监控线程已启动")
-
-        while not self._session_monitor_stop:
-            # 检查是否需要验证登录状态
-            current_time = time.time()
-            if current_time - self._last_check_time >= COOKIE_CHECK_INTERVAL:
-                self._last_check_time = current_time
-
-                # 检查登录状态
-                if not self.is_logged_in():
-                    logger.warning("检测到会话已失效")
-
-                    # 如果设置了回调函数，调用它
-                    if self._login_callback:
-                        try:
-                            self._login_callback()
-                        except Exception as e:
-                            logger.error(f"执行登录回调函数时出错: {e}")
-                else:
-                    # 访问一次受保护资源，保持会话活跃
-                    try:
-                        self.session.get(
-                            LOGIN_CHECK_URL,
-                            timeout=10
-                        )
-                        logger.debug("已刷新会话状态")
-                    except Exception as e:
-                        logger.error(f"刷新会话状态时出错: {e}")
-
-            # 休眠一段时间
-            time.sleep(10)  # 每10秒检查一次是否需要验证登录状态
+    def _check_session(self) -> None:
+        """会话状态检查任务，由调度器每隔 COOKIE_CHECK_INTERVAL 秒执行一次"""
+        # is_logged_in 本身会访问受保护资源，同时起到保持会话活跃的作用
+        if not self.is_logged_in():
+            logger.warning("检测到会话已失效")
+            self.invalidate_login_cache()
 
-        logger.info("会话监控线程已退出")
+            # 如果设置了回调函数，调用它
+            if self._login_callback:
+                try:
+                    self._login_callback()
+                except Exception as e:
+                    logger.error("执行登录回调函数时出错: %s", e)
+        else:
+            logger.debug("已刷新会话状态")
 
     def ensure_logged_in(self, username: str = None, password: str = None) -> bool:
         """
@@ -507,14 +665,17 @@ class JAccountLogin:
         logger.info("会话未登录，尝试登录")
 
         # 如果未提供用户名和密码，提示输入
+        if username is None or password is None:
+            # 先输出已缓冲的日志，避免与输入提示交错显示
+            for handler in logging.getLogger().handlers:
+                handler.flush()
         if username is None:
-            time.sleep(1)
             username = input("请输入 jAccount 用户名: ")
         if password is None:
-            time.sleep(1)
             # password = input("请输入 jAccount 密码: ")
             print("我们使用了 getpass4 模块来隐藏密码输入，但是它在 PyCharm 终端下不受支持。")
             print("如果你正在使用 PyCharm，请退出程序并使用其他命令行终端执行 Python 文件。")
+            from getpass4 import getpass  # 仅交互式登录时需要，延迟导入
             password = getpass("请输入 jAccount 密码:") # 让输入不可见，提高隐私保护
             
         # 尝试登录
@@ -0,0 +1,52 @@
+"""
+JSON 编解码工具模块
+
+优先使用 orjson 进行 JSON 的序列化与反序列化，未安装 orjson 时回退到标准库 json。
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+# orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，两种实现下均可用它捕获解析错误
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """
+    解析 JSON 数据
+
+    参数:
+        data: JSON 文本，可以是 bytes 或 str
+
+    返回:
+        解析后的 Python 对象
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    将对象序列化为 UTF-8 编码的 JSON（不转义非 ASCII 字符）
+
+    参数:
+        obj: 要序列化的对象
+        indent: 是否使用 2 空格缩进输出，默认输出紧凑格式
+
+    返回:
+        JSON 字节串
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -8,29 +8,85 @@ import logging
 import importlib
 import pkgutil
 import asyncio
-import uuid
-import json
+import time
+import secrets
 from typing import Dict, List, Any, Optional, Union
 from pathlib import Path
 import functools
 import inspect
 
-from fastapi import FastAPI, Request, Response, HTTPException
-from fastapi.responses import JSONResponse, StreamingResponse
-from fastapi.middleware.cors import CORSMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
 import uvicorn
 
 from .jaccount_login import JAccountLoginManager
+from . import json_utils
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+class MCPJSONResponse(JSONResponse):
+    """使用 json_utils（优先 orjson）序列化响应体的 JSONResponse"""
+
+    def render(self, content: Any) -> bytes:
+        return json_utils.dumps(content)
+
+def _error_body(code: int, message: str) -> bytes:
+    """构造 id 为 server-error 的 JSON-RPC 错误响应体（已序列化）"""
+    return json_utils.dumps({
+        "jsonrpc": "2.0",
+        "id": "server-error",
+        "error": {
+            "code": code,
+            "message": message
+        }
+    })
+
+# 固定内容的错误响应体，模块加载时序列化一次
+_ERR_406_BODY = _error_body(
+    -32600, "Not Acceptable: Client must accept both application/json and text/event-stream"
+)
+_ERR_405_BODY = _error_body(
+    -32601, "Method Not Allowed: GET requires Accept: text/event-stream"
+)
+
+# 工具均无参数，所有工具共享同一个 inputSchema（只读，不可修改）
+_EMPTY_SCHEMA = {
+    "type": "object",
+    "properties": {},
+    "required": []
+}
+
+# 通知的方法名前缀
+_NOTIFICATION_PREFIX = "notifications/"
+
+# SSE 保活 ping 事件
+_SSE_PING = b"event: ping\ndata: {}\n\n"
+
+def _error_response(status_code: int, body: bytes) -> Response:
+    """直接返回已序列化的错误响应体，跳过 JSONResponse 的重复编码"""
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+# 缓存 jAccount 登录单例，首次创建上下文时解析（不能在导入时获取，
+# 需等 create_mcp_server 按 config_path 完成初始化）
+_JACCOUNT_CACHE = {"inst": None}
+
 class SJTUContext:
     """SJTU 上下文类，提供 jAccount 登录状态和会话访问"""
     
+    __slots__ = ("session_id", "_jaccount", "state")
+    
     def __init__(self, session_id: Optional[str] = None):
         self.session_id = session_id
-        self._jaccount = JAccountLoginManager.get_instance()
+        self.state: Dict[str, Any] = {}  # 工具在同一会话内跨调用复用的数据（如令牌缓存）
+        inst = _JACCOUNT_CACHE["inst"]
+        if inst is None:
+            inst = _JACCOUNT_CACHE["inst"] = JAccountLoginManager.get_instance()
+        self._jaccount = inst
     
     def is_logged_in(self) -> bool:
         """检查用户是否已登录 jAccount"""
@@ -89,7 +145,8 @@ def register_tool(name: str = None, description: str = None, require_login: bool
             'name': func_name,
             'description': func_doc,
             'require_login': require_login,
-            'original_func': func
+            'original_func': func,
+            'is_async': inspect.iscoroutinefunction(func)
         }
         
         return wrapper
@@ -100,165 +157,147 @@ class MCPStreamableHTTPServer:
     
     def __init__(self, name: str = "SJTU-Chatbot MCP Server"):
         self.name = name
-        self.app = FastAPI(title=name)
         self.sessions = {}  # session_id -> session_data
         self.tools = {}     # tool_name -> tool_function
+        # 按注册顺序平行存放的工具名称和描述，用于构建 tools/list
+        self._tool_names: List[str] = []
+        self._tool_descriptions: List[str] = []
+        self._tools_list_result = {"tools": []}  # 缓存的 tools/list 结果
+        # initialize 结果在各会话间相同，只构造一次（只读，不可修改）
+        self._init_result_template = {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {
+                "experimental": {},
+                "prompts": {"listChanged": False},
+                "resources": {"subscribe": False, "listChanged": False},
+                "tools": {"listChanged": False}
+            },
+            "serverInfo": {
+                "name": self.name,
+                "version": "1.0.0"
+            }
+        }
+        
+        # JSON-RPC 请求方法 -> 处理函数
+        self._method_handlers = {
+            "initialize": self._handle_initialize,
+            "tools/list": self._handle_tools_list,
+            "tools/call": self._handle_tools_call,
+        }
         
         # 初始化 jAccount 登录管理器
         self.jaccount_login = JAccountLoginManager.get_instance()
         
-        # 配置CORS
-        self.app.add_middleware(
-            CORSMiddleware,
-            allow_origins=["*"],
-            allow_credentials=True,
-            allow_methods=["*"],
-            allow_headers=["*"],
+        # 直接使用 Starlette 路由（/mcp 不需要 FastAPI 的依赖注入和参数校验），并配置CORS
+        self.app = Starlette(
+            routes=self._setup_routes(),
+            middleware=[
+                Middleware(
+                    CORSMiddleware,
+                    allow_origins=["*"],
+                    allow_credentials=True,
+                    allow_methods=["*"],
+                    allow_headers=["*"],
+                )
+            ],
         )
         
-        # 注册路由
-        self._setup_routes()
-        
         # 自动扫描并注册工具
         self._scan_and_register_tools()
         
         logger.info(f"MCP 服务器已初始化，名称: {name}")
     
-    def _setup_routes(self):
+    def _setup_routes(self) -> List[Route]:
         """设置路由，完全符合 MCP Streamable HTTP 规范"""
-        
-        @self.app.post("/mcp")
-        @self.app.post("/mcp/") 
-        async def handle_post(request: Request):
-            return await self._handle_mcp_request(request)
-        
-        @self.app.get("/mcp")
-        @self.app.get("/mcp/")
-        async def handle_get(request: Request):
-            return await self._handle_mcp_get(request)
+        return [
+            Route("/mcp", self._handle_mcp_request, methods=["POST"]),
+            Route("/mcp/", self._handle_mcp_request, methods=["POST"]),
+            Route("/mcp", self._handle_mcp_get, methods=["GET"]),
+            Route("/mcp/", self._handle_mcp_get, methods=["GET"]),
+        ]
     
     async def _handle_mcp_request(self, request: Request):
         """处理 POST 请求 - 符合 MCP 规范"""
         try:
             # 检查 Accept 头
+            # 请求头只读取一次：Accept 头的扫描结果供准入检查和响应格式选择共用，
+            # session ID 向下传给各方法处理函数
             accept_header = request.headers.get("accept", "")
-            if "application/json" not in accept_header and "text/event-stream" not in accept_header:
-                return JSONResponse(
-                    status_code=406,
-                    content={
-                        "jsonrpc": "2.0",
-                        "id": "server-error",
-                        "error": {
-                            "code": -32600,
-                            "message": "Not Acceptable: Client must accept both application/json and text/event-stream"
-                        }
-                    },
-                    headers={"Content-Type": "application/json"}
-                )
+            session_id = request.headers.get("mcp-session-id")
+            accepts_json = "application/json" in accept_header
+            accepts_sse = "text/event-stream" in accept_header
+            if not accepts_json and not accepts_sse:
+                return _error_response(406, _ERR_406_BODY)
             
             # 解析请求体
             try:
-                body = await request.body()
+                # 逐块读入同一个 bytearray，避免先收集分块再 join 的二次拷贝
+                body = bytearray()
+                async for chunk in request.stream():
+                    body.extend(chunk)
                 if not body:
                     raise ValueError("Empty request body")
                 
-                data = json.loads(body.decode('utf-8'))
+                data = json_utils.loads(body)
             except Exception as e:
-                return JSONResponse(
-                    status_code=400,
-                    content={
-                        "jsonrpc": "2.0",
-                        "id": "server-error", 
-                        "error": {
-                            "code": -32700,
-                            "message": f"Parse error: {str(e)}"
-                        }
-                    },
-                    headers={"Content-Type": "application/json"}
-                )
+                return _error_response(400, _error_body(-32700, f"Parse error: {str(e)}"))
+            
+            # 通知无需响应内容，解析成功后跳过分发直接返回 202（格式错误的请求体仍按上面返回 400）
+            if type(data) is dict and "id" not in data:
+                method = data.get("method")
+                if isinstance(method, str) and method.startswith(_NOTIFICATION_PREFIX):
+                    return Response(content=b"{}", status_code=202, media_type="application/json")
             
             # 处理 JSON-RPC 请求
-            response = await self._process_jsonrpc_request(data, request)
+            response = await self._process_jsonrpc_request(data, request, session_id)
             
             # 如果响应为None（通知），返回202 Accepted
             if response is None:
-                return JSONResponse(
+                return MCPJSONResponse(
                     status_code=202,
                     content={},
                     headers={"Content-Type": "application/json"}
                 )
             
             # 检查是否需要设置session ID头
-            session_id = getattr(request, '_session_id', None)
+            new_session_id = getattr(request, '_session_id', None)
             extra_headers = {}
-            if session_id:
-                extra_headers["Mcp-Session-Id"] = session_id
+            if new_session_id:
+                extra_headers["Mcp-Session-Id"] = new_session_id
             
             # 根据 Accept 头决定响应格式
             # 优先返回JSON响应以兼容更多客户端（如Dify插件）
             # 只有当客户端明确只接受SSE流时才返回SSE
-            if "application/json" in accept_header:
+            if accepts_json:
                 # 返回 JSON（优先选择）
-                return JSONResponse(
-                    content=response,
-                    headers={
-                        "Content-Type": "application/json",
-                        **extra_headers
-                    }
-                )
-            elif "text/event-stream" in accept_header:
-                # 返回 SSE 流（仅当不支持JSON时）
-                return StreamingResponse(
-                    self._create_sse_response(response),
-                    media_type="text/event-stream",
-                    headers={
-                        "Cache-Control": "no-cache",
-                        "Connection": "keep-alive",
-                        **extra_headers
-                    }
-                )
-            else:
-                # 这种情况理论上不会发生，因为我们在上面已经检查过Accept头
-                return JSONResponse(
+                return MCPJSONResponse(
                     content=response,
                     headers={
                         "Content-Type": "application/json",
                         **extra_headers
                     }
                 )
+            # 返回 SSE 流（仅当不支持JSON时，准入检查已保证 accepts_sse 为真）
+            return StreamingResponse(
+                self._create_sse_response(response),
+                media_type="text/event-stream",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "Connection": "keep-alive",
+                    **extra_headers
+                }
+            )
                 
         except Exception as e:
             logger.error(f"处理MCP请求时出错: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "jsonrpc": "2.0",
-                    "id": "server-error",
-                    "error": {
-                        "code": -32603,
-                        "message": f"Internal error: {str(e)}"
-                    }
-                },
-                headers={"Content-Type": "application/json"}
-            )
+            return _error_response(500, _error_body(-32603, f"Internal error: {str(e)}"))
     
     async def _handle_mcp_get(self, request: Request):
         """处理 GET 请求 - 用于 SSE 流"""
         accept_header = request.headers.get("accept", "")
         
         if "text/event-stream" not in accept_header:
-            return JSONResponse(
-                status_code=405,
-                content={
-                    "jsonrpc": "2.0",
-                    "id": "server-error",
-                    "error": {
-                        "code": -32601,
-                        "message": "Method Not Allowed: GET requires Accept: text/event-stream"
-                    }
-                },
-                headers={"Content-Type": "application/json"}
-            )
+            return _error_response(405, _ERR_405_BODY)
         
         # 返回 SSE 流用于服务器推送
         return StreamingResponse(
@@ -270,7 +309,7 @@ class MCPStreamableHTTPServer:
             }
         )
     
-    async def _process_jsonrpc_request(self, data: dict, request: Request) -> Optional[dict]:
+    async def _process_jsonrpc_request(self, data: dict, request: Request, session_id: Optional[str]) -> Optional[dict]:
         """处理 JSON-RPC 请求和通知"""
         method = data.get("method")
         params = data.get("params", {})
@@ -281,23 +320,12 @@ class MCPStreamableHTTPServer:
         
         try:
             # 处理请求方法
-            if method == "initialize":
-                if is_notification:
-                    logger.warning("initialize 方法不应该作为通知发送")
-                    return None
-                return await self._handle_initialize(params, request_id, request)
-            
-            elif method == "tools/list":
+            handler = self._method_handlers.get(method)
+            if handler is not None:
                 if is_notification:
-                    logger.warning("tools/list 方法不应该作为通知发送")
+                    logger.warning(f"{method} 方法不应该作为通知发送")
                     return None
-                return await self._handle_tools_list(params, request_id, request)
-            
-            elif method == "tools/call":
-                if is_notification:
-                    logger.warning("tools/call 方法不应该作为通知发送")
-                    return None
-                return await self._handle_tools_call(params, request_id, request)
+                return await handler(params, request_id, request, session_id)
             
             # 处理通知方法
             elif method == "notifications/initialized":
@@ -344,45 +372,31 @@ class MCPStreamableHTTPServer:
                     }
                 }
     
-    async def _handle_initialize(self, params: dict, request_id: str, request: Request) -> dict:
+    async def _handle_initialize(self, params: dict, request_id: str, request: Request, session_id: Optional[str]) -> dict:
         """处理初始化请求"""
         # 创建新会话
-        session_id = str(uuid.uuid4())
+        session_id = secrets.token_hex(16)
         self.sessions[session_id] = {
             "protocol_version": params.get("protocolVersion", "2024-11-05"),
             "client_info": params.get("clientInfo", {}),
             "capabilities": params.get("capabilities", {}),
-            "created_at": asyncio.get_event_loop().time()
+            "created_at": time.monotonic(),
+            "context": SJTUContext(session_id)
         }
         
         # 设置 session ID，用于在响应头中返回
         request._session_id = session_id
         
-        # 构造响应
-        response = {
+        # 构造响应（复用预构建的结果）
+        return {
             "jsonrpc": "2.0",
             "id": request_id,
-            "result": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {
-                    "experimental": {},
-                    "prompts": {"listChanged": False},
-                    "resources": {"subscribe": False, "listChanged": False},
-                    "tools": {"listChanged": False}
-                },
-                "serverInfo": {
-                    "name": self.name,
-                    "version": "1.0.0"
-                }
-            }
+            "result": self._init_result_template
         }
-        
-        return response
     
-    async def _handle_tools_list(self, params: dict, request_id: str, request: Request) -> dict:
+    async def _handle_tools_list(self, params: dict, request_id: str, request: Request, session_id: Optional[str]) -> dict:
         """处理工具列表请求"""
         # 验证 session（可选，但推荐）
-        session_id = request.headers.get("mcp-session-id")
         if session_id and session_id not in self.sessions:
             return {
                 "jsonrpc": "2.0",
@@ -393,30 +407,14 @@ class MCPStreamableHTTPServer:
                 }
             }
         
-        # 构造工具列表
-        tools = []
-        for tool_name, tool_func in self.tools.items():
-            if hasattr(tool_func, '_tool_info'):
-                info = tool_func._tool_info
-                tools.append({
-                    "name": info['name'],
-                    "description": info['description'],
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {},
-                        "required": []
-                    }
-                })
-        
+        # 工具集合在启动后不再变化，直接返回注册时构建好的结果
         return {
             "jsonrpc": "2.0",
             "id": request_id,
-            "result": {
-                "tools": tools
-            }
+            "result": self._tools_list_result
         }
     
-    async def _handle_tools_call(self, params: dict, request_id: str, request: Request) -> dict:
+    async def _handle_tools_call(self, params: dict, request_id: str, request: Request, session_id: Optional[str]) -> dict:
         """处理工具调用请求"""
         tool_name = params.get("name")
         arguments = params.get("arguments", {})
@@ -432,19 +430,21 @@ class MCPStreamableHTTPServer:
             }
         
         try:
-            # 创建上下文
-            session_id = request.headers.get("mcp-session-id")
-            context = SJTUContext(session_id)
+            # 获取上下文（已初始化的会话复用其上下文）
+            session = self.sessions.get(session_id)
+            context = session["context"] if session is not None else SJTUContext(session_id)
             
             # 调用工具
-            # tool_func = self.tools[tool_name]
-            # result = tool_func(context)
             tool_func = self.tools[tool_name]
-            result = tool_func(context, **arguments)
+            if tool_func._tool_info['is_async']:
+                result = await tool_func(context, **arguments)
+            else:
+                # 同步工具多为阻塞的网络请求，放到线程池中执行以免阻塞事件循环
+                result = await asyncio.to_thread(tool_func, context, **arguments)
             
             # 确保结果是字符串
             if not isinstance(result, str):
-                result = json.dumps(result, ensure_ascii=False, indent=2)
+                result = json_utils.dumps(result, indent=True).decode("utf-8")
             
             return {
                 "jsonrpc": "2.0",
@@ -472,20 +472,18 @@ class MCPStreamableHTTPServer:
     
     async def _create_sse_response(self, response_data: dict):
         """创建 SSE 响应流"""
-        # 发送数据
-        yield f"event: message\n"
-        yield f"data: {json.dumps(response_data, ensure_ascii=False)}\n\n"
-        
-        # 可选：发送完成事件
-        yield f"event: done\n"
-        yield f"data: {{}}\n\n"
+        # 响应内容已完整可知，数据事件和完成事件合并为一次发送
+        yield (
+            b"event: message\ndata: "
+            + json_utils.dumps(response_data)
+            + b"\n\nevent: done\ndata: {}\n\n"
+        )
     
     async def _create_keepalive_sse_stream(self):
         """创建保持连接的 SSE 流"""
         try:
             while True:
-                yield f"event: ping\n"
-                yield f"data: {{}}\n\n"
+                yield _SSE_PING
                 await asyncio.sleep(30)  # 每30秒发送ping
         except Exception:
             # 客户端断开连接
@@ -508,24 +506,46 @@ class MCPStreamableHTTPServer:
                     logger.info(f"已加载工具模块: sjtu_chatbot.tools.{module_name}")
                     
                     # 扫描模块中的所有函数，查找带有 _tool_info 的函数
-                    for attr_name in dir(module):
-                        attr = getattr(module, attr_name)
-                        if hasattr(attr, '_tool_info'):
-                            tool_info = attr._tool_info
-                            tool_name = tool_info['name']
-                            
-                            # 注册工具
-                            self.tools[tool_name] = attr
-                            logger.info(f"已注册工具: {tool_name}")
+                    for attr_name, attr in vars(module).items():
+                        tool_info = getattr(attr, '_tool_info', None)
+                        if tool_info is None:
+                            continue
+                        tool_name = tool_info['name']
+                        
+                        # 注册工具
+                        self._add_tool(tool_name, tool_info['description'], attr)
+                        logger.info(f"已注册工具: {tool_name}")
                             
                 except Exception as e:
                     logger.error(f"加载工具模块 sjtu_chatbot.tools.{module_name} 时出错: {e}")
         except Exception as e:
             logger.error(f"扫描工具模块时出错: {e}")
+        
+        self._build_tools_list_result()
+    
+    def _add_tool(self, tool_name: str, description: str, tool_func) -> None:
+        """注册工具，同名工具覆盖先前的注册"""
+        if tool_name in self.tools:
+            index = self._tool_names.index(tool_name)
+            self._tool_descriptions[index] = description
+        else:
+            self._tool_names.append(tool_name)
+            self._tool_descriptions.append(description)
+        self.tools[tool_name] = tool_func
+    
+    def _build_tools_list_result(self) -> None:
+        """根据已注册的工具构建 tools/list 的响应结果"""
+        self._tools_list_result = {
+            "tools": [
+                {"name": n, "description": d, "inputSchema": _EMPTY_SCHEMA}
+                for n, d in zip(self._tool_names, self._tool_descriptions)
+            ]
+        }
     
     def run(self, host: str = "0.0.0.0", port: int = 1896):
         """启动服务器"""
         logger.info(f"启动 MCP Streamable HTTP 服务器: http://{host}:{port}/mcp")
+        # uvicorn 默认的 "auto" 会在已安装 uvloop / httptools 时自动使用它们
         uvicorn.run(self.app, host=host, port=port, log_level="info")
 
 def create_mcp_server(config_path: Optional[Union[str, Path]] = None) -> MCPStreamableHTTPServer:
@@ -1,12 +1,14 @@
 from dataclasses import dataclass
 from typing import Any, List, Optional, Dict
-from .base.data_utils import from_str, from_none, from_bool, from_dict, from_int, from_list, from_union, to_class
+from .base.data_utils import from_str, from_opt_str, from_opt, from_bool, from_dict, from_int, from_list, to_class
 from ..mcp_server.server import register_tool, SJTUContext
+from ..mcp_server import json_utils
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class Birthday:
     birth_day: str
     birth_month: str
@@ -28,7 +30,7 @@ class Birthday:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class Major:
     id: str
     name: str
@@ -47,7 +49,7 @@ class Major:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class OrganizeInfo:
     id: str
     name: str
@@ -66,7 +68,7 @@ class OrganizeInfo:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class IdentityType:
     id: str
     name: str
@@ -85,7 +87,7 @@ class IdentityType:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class Identity:
     kind: str
     is_default: bool
@@ -114,44 +116,45 @@ class Identity:
     @staticmethod
     def from_dict(obj: Any) -> 'Identity':
         assert isinstance(obj, dict)
+        g = obj.get
         
-        kind = from_str(obj.get("kind"))
-        is_default = from_bool(obj.get("isDefault"))
-        code = from_union([from_str, from_none], obj.get("code"))
-        user_type = from_str(obj.get("userType"))
-        user_type_name = from_str(obj.get("userTypeName"))
+        kind = from_str(g("kind"))
+        is_default = from_bool(g("isDefault"))
+        code = from_opt_str(g("code"))
+        user_type = from_str(g("userType"))
+        user_type_name = from_str(g("userTypeName"))
         
         # 处理组织信息
-        organize = from_union([OrganizeInfo.from_dict, from_none], obj.get("organize"))
-        top_organize = from_union([OrganizeInfo.from_dict, from_none], obj.get("topOrganize"))
-        mgt_organize = from_union([OrganizeInfo.from_dict, from_none], obj.get("mgtOrganize"))
-        top_mgt_organize = from_union([OrganizeInfo.from_dict, from_none], obj.get("topMgtOrganize"))
+        organize = from_opt(OrganizeInfo.from_dict, g("organize"))
+        top_organize = from_opt(OrganizeInfo.from_dict, g("topOrganize"))
+        mgt_organize = from_opt(OrganizeInfo.from_dict, g("mgtOrganize"))
+        top_mgt_organize = from_opt(OrganizeInfo.from_dict, g("topMgtOrganize"))
         
-        status = from_str(obj.get("status"))
-        expire_date = from_str(obj.get("expireDate"))
-        create_date = from_int(obj.get("createDate"))
-        update_date = from_int(obj.get("updateDate"))
+        status = from_str(g("status"))
+        expire_date = from_str(g("expireDate"))
+        create_date = from_int(g("createDate"))
+        update_date = from_int(g("updateDate"))
         
-        class_no = from_union([from_str, from_none], obj.get("classNo"))
-        gjm = from_union([from_str, from_none], obj.get("gjm"))
-        default_optional = from_bool(obj.get("defaultOptional"))
+        class_no = from_opt_str(g("classNo"))
+        gjm = from_opt_str(g("gjm"))
+        default_optional = from_bool(g("defaultOptional"))
         
         # 处理专业信息
-        major = from_union([Major.from_dict, from_none], obj.get("major"))
+        major = from_opt(Major.from_dict, g("major"))
         
-        admission_date = from_union([from_str, from_none], obj.get("admissionDate"))
-        train_level = from_union([from_str, from_none], obj.get("trainLevel"))
-        graduate_date = from_union([from_str, from_none], obj.get("graduateDate"))
+        admission_date = from_opt_str(g("admissionDate"))
+        train_level = from_opt_str(g("trainLevel"))
+        graduate_date = from_opt_str(g("graduateDate"))
         
         # 处理顶级组织列表
         top_organizes = None
-        if obj.get("topOrganizes"):
-            top_organizes = from_list(OrganizeInfo.from_dict, obj.get("topOrganizes"))
+        if g("topOrganizes"):
+            top_organizes = from_list(OrganizeInfo.from_dict, g("topOrganizes"))
         
-        photo_url = from_union([from_str, from_none], obj.get("photoUrl"))
+        photo_url = from_opt_str(g("photoUrl"))
         
         # 处理身份类型
-        identity_type = from_union([IdentityType.from_dict, from_none], obj.get("type"))
+        identity_type = from_opt(IdentityType.from_dict, g("type"))
         
         return Identity(
             kind, is_default, code, user_type, user_type_name,
@@ -166,31 +169,31 @@ class Identity:
         result: dict = {}
         result["kind"] = from_str(self.kind)
         result["isDefault"] = from_bool(self.is_default)
-        result["code"] = from_union([from_str, from_none], self.code)
+        result["code"] = from_opt_str(self.code)
         result["userType"] = from_str(self.user_type)
         result["userTypeName"] = from_str(self.user_type_name)
-        result["organize"] = from_union([lambda x: to_class(OrganizeInfo, x), from_none], self.organize)
-        result["topOrganize"] = from_union([lambda x: to_class(OrganizeInfo, x), from_none], self.top_organize)
-        result["mgtOrganize"] = from_union([lambda x: to_class(OrganizeInfo, x), from_none], self.mgt_organize)
-        result["topMgtOrganize"] = from_union([lambda x: to_class(OrganizeInfo, x), from_none], self.top_mgt_organize)
+        result["organize"] = from_opt(lambda x: to_class(OrganizeInfo, x), self.organize)
+        result["topOrganize"] = from_opt(lambda x: to_class(OrganizeInfo, x), self.top_organize)
+        result["mgtOrganize"] = from_opt(lambda x: to_class(OrganizeInfo, x), self.mgt_organize)
+        result["topMgtOrganize"] = from_opt(lambda x: to_class(OrganizeInfo, x), self.top_mgt_organize)
         result["status"] = from_str(self.status)
         result["expireDate"] = from_str(self.expire_date)
         result["createDate"] = from_int(self.create_date)
         result["updateDate"] = from_int(self.update_date)
-        result["classNo"] = from_union([from_str, from_none], self.class_no)
-        result["gjm"] = from_union([from_str, from_none], self.gjm)
+        result["classNo"] = from_opt_str(self.class_no)
+        result["gjm"] = from_opt_str(self.gjm)
         result["defaultOptional"] = from_bool(self.default_optional)
-        result["major"] = from_union([lambda x: to_class(Major, x), from_none], self.major)
-        result["admissionDate"] = from_union([from_str, from_none], self.admission_date)
-        result["trainLevel"] = from_union([from_str, from_none], self.train_level)
-        result["graduateDate"] = from_union([from_str, from_none], self.graduate_date)
-        result["topOrganizes"] = from_union([lambda x: from_list(lambda y: to_class(OrganizeInfo, y), x), from_none], self.top_organizes)
-        result["photoUrl"] = from_union([from_str, from_none], self.photo_url)
-        result["type"] = from_union([lambda x: to_class(IdentityType, x), from_none], self.identity_type)
+        result["major"] = from_opt(lambda x: to_class(Major, x), self.major)
+        result["admissionDate"] = from_opt_str(self.admission_date)
+        result["trainLevel"] = from_opt_str(self.train_level)
+        result["graduateDate"] = from_opt_str(self.graduate_date)
+        result["topOrganizes"] = from_opt(lambda x: from_list(lambda y: to_class(OrganizeInfo, y), x), self.top_organizes)
+        result["photoUrl"] = from_opt_str(self.photo_url)
+        result["type"] = from_opt(lambda x: to_class(IdentityType, x), self.identity_type)
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class AccountInfo:
     id: str
     account: str
@@ -216,36 +219,37 @@ class AccountInfo:
     @staticmethod
     def from_dict(obj: Any) -> 'AccountInfo':
         assert isinstance(obj, dict)
+        g = obj.get
         
-        id = from_str(obj.get("id"))
-        account = from_str(obj.get("account"))
-        name = from_str(obj.get("name"))
-        kind = from_str(obj.get("kind"))
-        code = from_str(obj.get("code"))
-        user_type = from_str(obj.get("userType"))
+        id = from_str(g("id"))
+        account = from_str(g("account"))
+        name = from_str(g("name"))
+        kind = from_str(g("kind"))
+        code = from_str(g("code"))
+        user_type = from_str(g("userType"))
         
         # 处理组织信息
-        organize = OrganizeInfo.from_dict(obj.get("organize"))
-        top_organize = OrganizeInfo.from_dict(obj.get("topOrganize"))
+        organize = OrganizeInfo.from_dict(g("organize"))
+        top_organize = OrganizeInfo.from_dict(g("topOrganize"))
         
-        class_no = from_union([from_str, from_none], obj.get("classNo"))
-        avatars = from_dict(lambda x: x, obj.get("avatars", {}))
+        class_no = from_opt_str(g("classNo"))
+        avatars = from_dict(lambda x: x, g("avatars", {}))
         
         # 处理生日信息
-        birthday = from_union([Birthday.from_dict, from_none], obj.get("birthday"))
+        birthday = from_opt(Birthday.from_dict, g("birthday"))
         
-        gender = from_str(obj.get("gender"))
-        email = from_str(obj.get("email"))
-        time_zone = from_int(obj.get("timeZone"))
-        mobile = from_str(obj.get("mobile"))
+        gender = from_str(g("gender"))
+        email = from_str(g("email"))
+        time_zone = from_int(g("timeZone"))
+        mobile = from_str(g("mobile"))
         
         # 处理身份列表
-        identities = from_list(Identity.from_dict, obj.get("identities"))
+        identities = from_list(Identity.from_dict, g("identities"))
         
-        card_no = from_union([from_str, from_none], obj.get("cardNo"))
-        card_type = from_union([from_str, from_none], obj.get("cardType"))
-        union_id = from_union([from_str, from_none], obj.get("unionId"))
-        account_expire_date = from_union([from_str, from_none], obj.get("accountExpireDate"))
+        card_no = from_opt_str(g("cardNo"))
+        card_type = from_opt_str(g("cardType"))
+        union_id = from_opt_str(g("unionId"))
+        account_expire_date = from_opt_str(g("accountExpireDate"))
         
         return AccountInfo(
             id, account, name, kind, code, user_type,
@@ -264,22 +268,22 @@ class AccountInfo:
         result["userType"] = from_str(self.user_type)
         result["organize"] = to_class(OrganizeInfo, self.organize)
         result["topOrganize"] = to_class(OrganizeInfo, self.top_organize)
-        result["classNo"] = from_union([from_str, from_none], self.class_no)
+        result["classNo"] = from_opt_str(self.class_no)
         result["avatars"] = from_dict(lambda x: x, self.avatars)
-        result["birthday"] = from_union([lambda x: to_class(Birthday, x), from_none], self.birthday)
+        result["birthday"] = from_opt(lambda x: to_class(Birthday, x), self.birthday)
         result["gender"] = from_str(self.gender)
         result["email"] = from_str(self.email)
         result["timeZone"] = from_int(self.time_zone)
         result["mobile"] = from_str(self.mobile)
         result["identities"] = from_list(lambda x: to_class(Identity, x), self.identities)
-        result["cardNo"] = from_union([from_str, from_none], self.card_no)
-        result["cardType"] = from_union([from_str, from_none], self.card_type)
-        result["unionId"] = from_union([from_str, from_none], self.union_id)
-        result["accountExpireDate"] = from_union([from_str, from_none], self.account_expire_date)
+        result["cardNo"] = from_opt_str(self.card_no)
+        result["cardType"] = from_opt_str(self.card_type)
+        result["unionId"] = from_opt_str(self.union_id)
+        result["accountExpireDate"] = from_opt_str(self.account_expire_date)
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class ApiResponse:
     errno: int
     error: str
@@ -312,6 +316,16 @@ def account_info_to_dict(x: ApiResponse) -> Any:
     return to_class(ApiResponse, x)
 
 
+# 个人信息接口的请求头
+_ACCOUNT_HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Referer": "https://my.sjtu.edu.cn/",
+    "X-Requested-With": "XMLHttpRequest"
+}
+
+
 @register_tool(
     name="account_info",
     description="获取当前用户的个人信息，包括基本信息、身份信息、专业信息等",
@@ -342,21 +356,12 @@ def get_account_info(context: SJTUContext) -> Dict[str, Any]:
         # 使用已认证的session发起请求
         session = context.session
         
-        # 设置请求头
-        headers = {
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Referer": "https://my.sjtu.edu.cn/",
-            "X-Requested-With": "XMLHttpRequest"
-        }
-        
         logger.info("正在获取用户个人信息...")
         
         # 发起请求
         resp = session.get(
             "https://my.sjtu.edu.cn/api/account",
-            headers=headers,
+            headers=_ACCOUNT_HEADERS,
             timeout=30,
             allow_redirects=True
         )
@@ -374,7 +379,7 @@ def get_account_info(context: SJTUContext) -> Dict[str, Any]:
         
         # 解析JSON响应
         try:
-            data = resp.json()
+            data = json_utils.loads(resp.content)
         except ValueError as e:
             logger.error(f"响应不是有效的JSON格式: {e}")
             return {
@@ -403,8 +408,10 @@ def get_account_info(context: SJTUContext) -> Dict[str, Any]:
                 }
             
             # 获取第一个用户信息（通常只有一个）
+            # data 直接返回接口原始的用户数据（字段与上游 API 一致），
+            # 解析后的对象只用于校验和生成 summary，避免再经 to_dict 遍历一遍
             account_info = api_response.entities[0]
-            result_data = account_info.to_dict()
+            result_data = data["entities"][0]
             
             logger.info(f"成功获取用户 {account_info.account} ({account_info.name}) 的个人信息")
             return {
@@ -438,6 +445,27 @@ def get_account_info(context: SJTUContext) -> Dict[str, Any]:
         }
 
 
+def get_account_info_cached(context: SJTUContext, ttl: float = 300) -> Dict[str, Any]:
+    """
+    获取当前用户的个人信息，成功结果在会话上下文中缓存 ttl 秒
+    
+    Args:
+        context: SJTU上下文，包含已认证的会话
+        ttl: 缓存有效期（秒）
+        
+    Returns:
+        与 get_account_info 相同格式的结果字典
+    """
+    now = time.monotonic()
+    cached = context.state.get('account_info')
+    if cached and now - cached[0] < ttl:
+        return cached[1]
+    result = get_account_info(context)
+    if result["success"]:
+        context.state['account_info'] = (now, result)
+    return result
+
+
 # 工具元数据（用于MCP服务器自动发现）
 TOOL_METADATA = {
     "name": "account_info",
@@ -32,6 +32,15 @@ def from_none(x: Any) -> Any:
     return x
 
 
+def from_opt_str(x: Any) -> Optional[str]:
+    assert x is None or isinstance(x, str)
+    return x
+
+
+def from_opt(f: Callable[[Any], T], x: Any) -> Optional[T]:
+    return None if x is None else f(x)
+
+
 def from_union(fs, x):
     for f in fs:
         try:
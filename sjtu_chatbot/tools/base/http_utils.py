@@ -0,0 +1,134 @@
+"""
+HTTP 工具模块
+
+为工具模块提供复用连接池的 requests 会话和页面结果缓存。
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_pooled_session(pool_maxsize: int = 8, retries: int = 3) -> requests.Session:
+    """
+    创建带连接池和有限重试的 requests 会话
+
+    参数:
+        pool_maxsize: 每个主机的最大连接数
+        retries: 网关类错误（502/503/504）及连接错误的最大重试次数，POST 请求不重试
+
+    返回:
+        requests.Session 实例，可在模块级共享以复用 TCP/TLS 连接
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False
+        )
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class TTLPageCache:
+    """
+    按 URL 缓存页面解析结果的 TTL 缓存
+
+    缓存过期后携带 ETag / Last-Modified 发起条件请求，服务器返回 304 时
+    直接续期已有结果，跳过下载和解析。刷新失败时继续返回已缓存的旧结果。
+    同一 URL 的并发请求只发起一次，其余调用方等待并共享其结果。
+    """
+
+    def __init__(self, session: requests.Session, ttl: float = 300):
+        """
+        参数:
+            session: 用于发起请求的会话
+            ttl: 缓存有效期（秒）
+        """
+        self._session = session
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # url -> (过期时间, 条件请求头, 解析结果)
+        self._entries: Dict[str, Tuple[float, Dict[str, str], Any]] = {}
+        # url -> 正在进行的请求
+        self._inflight: Dict[str, Future] = {}
+
+    def fetch(self, url: str, parse: Callable[[requests.Response], Any],
+              force_refresh: bool = False, **kwargs) -> Optional[Any]:
+        """
+        获取页面解析结果，优先使用未过期的缓存
+
+        参数:
+            url: 页面地址
+            parse: 将 200 响应解析为结果的函数
+            force_refresh: 是否忽略缓存重新下载
+            **kwargs: 透传给 session.get 的参数（如 timeout）
+
+        返回:
+            解析结果；刷新失败（请求出错或状态既不是 200 也不是 304）时返回已缓存的旧结果，
+            没有缓存时返回 None（请求出错则抛出异常）
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None and not force_refresh and time.monotonic() < entry[0]:
+                return entry[2]
+            future = self._inflight.get(url)
+            is_leader = future is None
+            if is_leader:
+                future = self._inflight[url] = Future()
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = self._load(url, entry, parse, force_refresh, kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[url]
+
+    def _load(self, url: str, entry: Optional[Tuple[float, Dict[str, str], Any]],
+              parse: Callable[[requests.Response], Any], force_refresh: bool,
+              kwargs: Dict[str, Any]) -> Optional[Any]:
+        """下载并解析页面（或用 304 续期缓存），写回缓存后返回结果"""
+        headers = entry[1] if entry is not None and not force_refresh else None
+        try:
+            resp = self._session.get(url, headers=headers, **kwargs)
+        except requests.RequestException:
+            if entry is None:
+                raise
+            return entry[2]
+        if resp.status_code == 304 and entry is not None:
+            result = entry[2]
+            validators = entry[1]
+        elif resp.status_code == requests.codes.ok:
+            result = parse(resp)
+            validators = {}
+            if 'ETag' in resp.headers:
+                validators['If-None-Match'] = resp.headers['ETag']
+            if 'Last-Modified' in resp.headers:
+                validators['If-Modified-Since'] = resp.headers['Last-Modified']
+        else:
+            # 刷新失败时不续期，下次调用会再次尝试
+            return entry[2] if entry is not None else None
+
+        with self._lock:
+            self._entries[url] = (time.monotonic() + self._ttl, validators, result)
+        return result
+
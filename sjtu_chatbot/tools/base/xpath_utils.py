@@ -0,0 +1,18 @@
+"""
+XPath 工具模块
+
+为网页抓取工具提供构建 XPath 表达式的辅助函数。
+"""
+
+
+def has_class(name: str) -> str:
+    """
+    生成匹配 class 属性中包含指定类名的 XPath 条件
+
+    参数:
+        name: 类名
+
+    返回:
+        可放在 [] 中的 XPath 谓词，行为与 CSS 的 .name 选择器一致
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
@@ -1,9 +1,14 @@
 from ..mcp_server.server import register_tool, SJTUContext
-from .account_info import get_account_info
+from ..mcp_server import json_utils
+from .account_info import get_account_info_cached
+from .base.http_utils import create_pooled_session
 import requests
 from typing import List, Dict, Any, Optional
 from urllib import parse
 import base64
+import time
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 HEADERS = {
     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
@@ -21,6 +26,26 @@ HEADERS = {
     'sec-ch-ua-platform': '"Windows"',
 }
 
+ACTIVITY_BASE_URL = 'https://activity.sjtu.edu.cn'
+ACTIVITY_DETAIL_URL = ACTIVITY_BASE_URL + '/activity/detail/'
+
+# 活动平台接口共享的连接池会话（令牌通过 Bearer 头传递，不依赖 Cookie）
+_ACTIVITY = create_pooled_session()
+
+# 活动平台令牌在会话上下文中的缓存有效期（秒）
+ACTIVITY_TOKEN_TTL = 3500
+
+class ActivityAuthError(Exception):
+    """活动平台令牌失效（HTTP 401）"""
+
+def _auth(token: str) -> Dict[str, str]:
+    return {'Authorization': f'Bearer {token}'}
+
+def _json(resp: requests.Response) -> Any:
+    if resp.status_code == 401:
+        raise ActivityAuthError("活动平台授权已失效")
+    return json_utils.loads(resp.content)
+
 def getJaccountOIDCToken(sess: requests.Session) -> str:
     req1 = sess.get('https://jaccount.sjtu.edu.cn/oauth2/authorize', params={
                             'client_id': "NMCTdJI6Tluw2SSTe6tW",
@@ -30,29 +55,31 @@ def getJaccountOIDCToken(sess: requests.Session) -> str:
                         }, headers=HEADERS)
     code = parse.parse_qs(parse.urlparse(req1.url).query)['code'][0]
     req2 = sess.get('https://activity.sjtu.edu.cn/api/v1/login/token', params={'code':code}, headers=HEADERS)
-    token = req2.json()['data']
+    token = _json(req2)['data']
     return token
 
 def getActivityTypes(token: str)->Optional[Dict[str, Any]]:
-    return requests.get(
+    resp = _ACTIVITY.get(
         url='https://activity.sjtu.edu.cn/api/v1/system/activity_type',
         params={'isAll': 'true'}, 
-        headers={'Authorization': 'Bearer ' + token},
-    ).json()["data"]
+        headers=_auth(token),
+    )
+    return _json(resp)["data"]
     
 def getHotActivities(token: str, type_id: int = 1)->Optional[Dict[str, Any]]:
-    return requests.get(
+    resp = _ACTIVITY.get(
         url='https://activity.sjtu.edu.cn/api/v1/hot/list', 
         params={
             'activity_type_id': type_id,
             'fill': '1',
         }, 
-        headers={'Authorization': 'Bearer ' + token}, 
-    ).json()["data"]
+        headers=_auth(token), 
+    )
+    return _json(resp)["data"]
     
 def getAllActivities(token: str, 
                      type_id: int = 1, page: int = 1, page_size: int = 9)->Optional[Dict[str, Any]]:
-    resp = requests.get(
+    resp = _ACTIVITY.get(
         url='https://activity.sjtu.edu.cn/api/v1/activity/list/home', 
         params={
             'page': page, ## 可翻页
@@ -61,86 +88,169 @@ def getAllActivities(token: str,
             'time_sort': 'desc',
             'can_apply': 'false'
         }, 
-        headers={'Authorization': 'Bearer ' + token}, 
+        headers=_auth(token), 
     )
-    return sorted(resp.json()["data"], key=lambda x: x['activity_time'][0], reverse=True)
+    data = _json(resp)["data"]
+    # 按活动开始时间排序；不能改用 itemgetter('activity_time')，那样开始时间相同时会再按结束时间排序
+    data.sort(key=lambda x: x['activity_time'][0], reverse=True)
+    return data
 
 def getSingleActivity(token: str, id: int):
-    resp = requests.get(
+    resp = _ACTIVITY.get(
         url=f'https://activity.sjtu.edu.cn/api/v1/activity/{id}', 
-        headers={'Authorization': 'Bearer ' + token}, 
+        headers=_auth(token), 
     )
-    return resp.json()["data"]
+    return _json(resp)["data"]
 
 def getProfile(token: str):
-    resp = requests.get(
+    resp = _ACTIVITY.get(
         url=f'https://activity.sjtu.edu.cn/api/v1/profile', 
-        headers={'Authorization': 'Bearer ' + token}, 
+        headers=_auth(token), 
     )
-    return resp.json()["data"]
+    return _json(resp)["data"]
+
+def getProfileAndActivity(token: str, id: int):
+    # 两个请求互不依赖，并发发出
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f_profile = ex.submit(getProfile, token)
+        f_activity = ex.submit(getSingleActivity, token, id)
+        return f_profile.result(), f_activity.result()
 
 def doSignUp(token, form_submit):
-    resp = requests.post(
+    resp = _ACTIVITY.post(
         url=f'https://activity.sjtu.edu.cn/api/v1/signUp',
-        json=form_submit,
-        headers={'Authorization': 'Bearer ' + token}, 
+        data=json_utils.dumps(form_submit),
+        headers={**_auth(token), 'Content-Type': 'application/json'},
     )
-    resp.raise_for_status()
-    return resp.json()
+    # 401 交给 _json 抛出 ActivityAuthError，以便调用方刷新令牌后重试
+    if resp.status_code != 401:
+        resp.raise_for_status()
+    return _json(resp)
 
+def _get_activity_token(context: SJTUContext, refresh: bool = False) -> str:
+    state = context.state
+    token = state.get('activity_token')
+    if not refresh and token and time.monotonic() < state['activity_token_expires_at']:
+        return token
+    token = getJaccountOIDCToken(context.session)
+    state['activity_token'] = token
+    state['activity_token_expires_at'] = time.monotonic() + ACTIVITY_TOKEN_TTL
+    return token
+
+def _call_with_token(context: SJTUContext, func, *args):
+    """使用缓存的令牌调用活动平台接口，令牌失效（401）时刷新并重试一次"""
+    try:
+        return func(_get_activity_token(context), *args)
+    except ActivityAuthError:
+        return func(_get_activity_token(context, refresh=True), *args)
+
+@lru_cache(maxsize=1024)
 def actIdToUrlParam(activityId:int) -> str:
-    idStr = str(activityId)
-    idStr = idStr + ' ' * ((3 - len(idStr)%3) % 3)
-    return base64.b64encode(idStr.encode('utf-8')).decode('utf-8')
+    idStr = f"{activityId}"
+    # 补空格到 3 的倍数，使 base64 结果不带 '=' 填充
+    return base64.b64encode((idStr + ' ' * (-len(idStr) % 3)).encode('ascii')).decode('ascii')
+
+# 报名方式编号 -> 描述，下标 0 不对应任何报名方式
+_METHOD_DESCS = (
+    "",
+    "线上报名（审核录取）",
+    "线下报名",
+    "线上报名（先到先得）",
+    "无需报名",
+    "线上报名（随机录取）",
+    "跳转其他报名",
+)
 
 def getSignUpMethodDesc(method: int):
-    match (method):
-        case 1:
-            return "线上报名（审核录取）"
-        case 2:
-            return "线下报名"
-        case 3:
-            return "线上报名（先到先得）"
-        case 4:
-            return "无需报名"
-        case 5:
-            return "线上报名（随机录取）"
-        case 6:
-            return "跳转其他报名"
-        case _:
-            raise Exception("no this method")
+    if not 0 < method < len(_METHOD_DESCS):
+        raise ValueError(f"no this method: {method}")
+    return _METHOD_DESCS[method]
 
 def get_activity_info_nl(activity: dict[str, Any]):
-    res = \
-    f"- [{activity['name']}]({'https://activity.sjtu.edu.cn/activity/detail/' + actIdToUrlParam(activity['id'])})" + "\n" + \
-    f"  ![]({'https://activity.sjtu.edu.cn' + activity['img']})" + "\n" + \
-    f"  id:{activity['id']}" + "\n" + \
-    f"  主办方：{activity['sponsor']}" + "\n" + \
-    (f"  报名人数：{activity['signed_up_num']} / {activity['person_num']}\n" if activity['person_num'] else "") + \
-    f"  报名方式：{getSignUpMethodDesc(activity['method'])}" + "\n" + \
-    (f"  报名时间：{activity['registration_time'][0]} ~ {activity['registration_time'][1]}\n" if activity['registration_time'][0] else "") + \
-    f"  活动地点：{activity['address']}" + "\n" + \
-    f"  活动时间：{activity['activity_time'][0]} ~ {activity['activity_time'][1]}"
-    return res
-
-def render_undetermined_form(form: dict[str, any]):
-    if (form['tag'] == 'ElInput'):
-        return f"- {form['label']}（类型：短文本）"
-    elif (form['tag'] == 'textarea'):
-        return f"- {form['label']}（类型：长文本）"
-    elif (form['tag'] == 'Selector'):
-        options = ','.join([("\"" + item['name'] + "\"") for item in form['dict']])
-        return f"- {form['label']}（类型：单选；可选项：{options}）"
-    elif (form['tag'] == 'RadioGroup'):
-        options = ','.join([("\"" + item['name'] + "\"") for item in form['dict']])
-        return f"- {form['label']}（类型：单选；可选项：{options}）"
-    elif (form['tag'] == 'CheckboxGroup'):
-        options = ','.join([("\"" + item['name'] + "\"") for item in form['dict']])
-        return f"- {form['label']}（类型：多选；可选项：{options}）"
-    elif (form['tag'] == 'file'):
-        return f"- {form['label']}（类型：附件；助手无法处理，请用户手动报名）"
-    elif (form['tag'] == 'img'):
-        return f"- {form['label']}（类型：图片；助手无法处理，请用户手动报名）"
+    a = activity
+    signed_up = f"  报名人数：{a['signed_up_num']} / {a['person_num']}\n" if a['person_num'] else ""
+    reg_time = a['registration_time']
+    registration = f"  报名时间：{reg_time[0]} ~ {reg_time[1]}\n" if reg_time[0] else ""
+    act_time = a['activity_time']
+    return (
+        f"- [{a['name']}]({ACTIVITY_DETAIL_URL}{actIdToUrlParam(a['id'])})\n"
+        f"  ![]({ACTIVITY_BASE_URL}{a['img']})\n"
+        f"  id:{a['id']}\n"
+        f"  主办方：{a['sponsor']}\n"
+        f"{signed_up}"
+        f"  报名方式：{getSignUpMethodDesc(a['method'])}\n"
+        f"{registration}"
+        f"  活动地点：{a['address']}\n"
+        f"  活动时间：{act_time[0]} ~ {act_time[1]}"
+    )
+
+def _get_mobile(account_info: dict, identity: Optional[dict]):
+    return account_info['mobile']
+
+def _get_email(account_info: dict, identity: Optional[dict]):
+    return account_info['email']
+
+def _get_cardno(account_info: dict, identity: Optional[dict]):
+    return account_info['cardNo']
+
+def _get_org_name(account_info: dict, identity: Optional[dict]):
+    return identity['organize']['name'] if identity and identity.get('organize') else None
+
+def _get_major_name(account_info: dict, identity: Optional[dict]):
+    return identity['major']['name'] if identity and identity.get('major') else None
+
+# 表单字段标签关键字 -> 取值函数，按顺序匹配第一个出现在标签中的关键字
+FIELD_MATCHERS = (
+    ("手机", _get_mobile),
+    ("邮箱", _get_email),
+    ("身份证", _get_cardno),
+    ("学院", _get_org_name),
+    ("专业", _get_major_name),
+)
+
+def _match_field(label: str):
+    for keyword, getter in FIELD_MATCHERS:
+        if keyword in label:
+            return getter
+    return None
+
+def _render_options(form: dict[str, Any]) -> str:
+    return ','.join(f'"{item["name"]}"' for item in form['dict'])
+
+def _render_input(form: dict[str, Any]) -> str:
+    return f"- {form['label']}（类型：短文本）"
+
+def _render_textarea(form: dict[str, Any]) -> str:
+    return f"- {form['label']}（类型：长文本）"
+
+def _render_single_choice(form: dict[str, Any]) -> str:
+    return f"- {form['label']}（类型：单选；可选项：{_render_options(form)}）"
+
+def _render_multi_choice(form: dict[str, Any]) -> str:
+    return f"- {form['label']}（类型：多选；可选项：{_render_options(form)}）"
+
+def _render_file(form: dict[str, Any]) -> str:
+    return f"- {form['label']}（类型：附件；助手无法处理，请用户手动报名）"
+
+def _render_img(form: dict[str, Any]) -> str:
+    return f"- {form['label']}（类型：图片；助手无法处理，请用户手动报名）"
+
+def _render_unknown(form: dict[str, Any]) -> str:
+    return f"- {form['label']}（类型：{form['tag']}；助手无法处理，请用户手动报名）"
+
+# 表单组件类型 -> 渲染函数
+_RENDERERS = {
+    'ElInput': _render_input,
+    'textarea': _render_textarea,
+    'Selector': _render_single_choice,
+    'RadioGroup': _render_single_choice,
+    'CheckboxGroup': _render_multi_choice,
+    'file': _render_file,
+    'img': _render_img,
+}
+
+def render_undetermined_form(form: dict[str, Any]) -> str:
+    return _RENDERERS.get(form['tag'], _render_unknown)(form)
 
 @register_tool(
     name="sjtu_activity",
@@ -150,10 +260,8 @@ def render_undetermined_form(form: dict[str, any]):
 def sjtu_activity(context: SJTUContext, page: int = 1) -> dict:
     if not context.is_logged_in():
         return {"success": False, "error": "用户未登录，请先登录 jAccount"}
-    sess = context.session
     try:
-        token = getJaccountOIDCToken(sess)
-        result = getAllActivities(token, 2, page, 10)
+        result = _call_with_token(context, getAllActivities, 2, page, 10)
         return {"success": True, "data": [get_activity_info_nl(item) for item in result]}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -166,13 +274,10 @@ def sjtu_activity(context: SJTUContext, page: int = 1) -> dict:
 def sjtu_activity_signup(context: SJTUContext, id: int, additional_info: str = "{}") -> dict:
     if not context.is_logged_in():
         return {"success": False, "error": "用户未登录，请先登录 jAccount"}
-    sess = context.session
     try:
-        token = getJaccountOIDCToken(sess)
-        profile = getProfile(token)
+        profile, activity = _call_with_token(context, getProfileAndActivity, id)
         if (not profile):
             return {"success": False, "error": "授权失败"}
-        activity = getSingleActivity(token, id)
         if (not activity):
             return {"success": False, "error": "找不到活动"}
         if (activity['in_signed_up'] == True):
@@ -180,8 +285,7 @@ def sjtu_activity_signup(context: SJTUContext, id: int, additional_info: str = "
         form_infos = activity['sign_up_info']['form_design']
         form_submit = {"id":id,"college":profile['topOrganizeId'],"form_value":{}}
         if (form_infos):
-            import json
-            account_info_result = get_account_info(context)
+            account_info_result = get_account_info_cached(context)
             if not account_info_result["success"]:
                 return {"success": False, "error": "无法获取用户信息"}
             account_info = account_info_result["data"]
@@ -190,21 +294,16 @@ def sjtu_activity_signup(context: SJTUContext, id: int, additional_info: str = "
                 if ident.get("isDefault"):
                     identity = ident
                     break
-            additional_forminfos = json.loads(additional_info)
+            additional_forminfos = json_utils.loads(additional_info)
             undetermined_forms = []
+            form_value = form_submit['form_value']
             for form_info in form_infos:
-                if ("手机" in str(form_info['label'])):
-                    form_submit['form_value'][form_info['id']] = account_info['mobile']
-                elif ("邮箱" in str(form_info['label'])):
-                    form_submit['form_value'][form_info['id']] = account_info['email']
-                elif ("身份证" in str(form_info['label'])):
-                    form_submit['form_value'][form_info['id']] = account_info['cardNo']
-                elif ("学院" in str(form_info['label'])):
-                    form_submit['form_value'][form_info['id']] = identity['organize']['name'] if identity and identity.get('organize') else None
-                elif ("专业" in str(form_info['label'])):
-                    form_submit['form_value'][form_info['id']] = identity['major']['name'] if identity and identity.get('major') else None
-                elif (str(form_info['label']) in additional_forminfos):
-                    form_submit['form_value'][form_info['id']] = additional_forminfos[str(form_info['label'])]
+                label = str(form_info['label'])
+                getter = _match_field(label)
+                if (getter is not None):
+                    form_value[form_info['id']] = getter(account_info, identity)
+                elif (label in additional_forminfos):
+                    form_value[form_info['id']] = additional_forminfos[label]
                 else:
                     undetermined_forms.append(form_info)
             if (len(undetermined_forms) > 0):
@@ -212,7 +311,7 @@ def sjtu_activity_signup(context: SJTUContext, id: int, additional_info: str = "
                     [render_undetermined_form(form) for form in undetermined_forms]
                 )
                 return {"success": False, "error": "报名需要补充以下信息：\n" + forms_rendered}
-        resp = doSignUp(token, form_submit)
+        resp = _call_with_token(context, doSignUp, form_submit)
         if resp.get("errno", 0) == 0:
             return {"success": True, "message": "报名成功"}
         else:
@@ -0,0 +1,39 @@
+from ..mcp_server.server import register_tool, SJTUContext
+from .sjtu_jwc import fetch_jwc_news
+from .sjtu_news import fetch_sjtu_news
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (栏目标题, 获取函数)
+_SOURCES = (
+    ("教务处通知公告", fetch_jwc_news),
+    ("交大新闻网", fetch_sjtu_news),
+)
+
+@register_tool(
+    name="sjtu_all_news",
+    description="同时获取教务处通知公告和交大新闻网的新闻，合并为一份列表。结果会缓存 5 分钟，参数 force_refresh 为 true 时忽略缓存重新获取。",
+    require_login=False
+)
+def sjtu_all_news(context: SJTUContext, force_refresh: bool = False) -> dict:
+    # 两个站点的请求互不依赖，并发发出
+    with ThreadPoolExecutor(max_workers=len(_SOURCES)) as ex:
+        futures = [ex.submit(fetch, force_refresh) for _, fetch in _SOURCES]
+    sections = []
+    succeeded = False
+    for (title, _), future in zip(_SOURCES, futures):
+        try:
+            output = future.result()
+        except Exception as e:
+            logger.error(f"获取{title}失败: {e}")
+            output = None
+        if output is None:
+            sections.append(f"## {title}\n\n获取信息失败，请检查网络连接")
+        else:
+            succeeded = True
+            sections.append(f"## {title}\n\n{output}")
+    if not succeeded:
+        return {"success": False, "error": "获取信息失败，请检查网络连接"}
+    return {"success": True, "data": '\n\n'.join(sections)}
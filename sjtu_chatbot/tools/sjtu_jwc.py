@@ -1,53 +1,83 @@
 from ..mcp_server.server import register_tool, SJTUContext
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Tuple
+import lxml.html
+from lxml.etree import XPath
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 import urllib3
+from .base.http_utils import create_pooled_session, TTLPageCache
+from .base.xpath_utils import has_class
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# 模块级共享会话，跨调用复用到 jwc.sjtu.edu.cn 的连接
+_SESSION = create_pooled_session(pool_maxsize=20, retries=1)
+_SESSION.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+_SESSION.headers['Accept'] = 'text/html,*/*;q=0.9'
+
+# (连接超时, 读取超时)；会话只重试一次，站点无法连接时约 6 秒内失败
+_TIMEOUT = (3.05, 10)
+
+JWC_NEWS_URL = 'https://jwc.sjtu.edu.cn/xwtg/tztg.htm'
+
+# 页面解析结果缓存 5 分钟，过期后发条件请求
+_CACHE = TTLPageCache(_SESSION, ttl=300)
+
+class JwcRow(NamedTuple):
+    date: str
+    title: str
+    link: str
+    summary: str
+
+# 页面按 UTF-8 解码，直接解析响应字节
+_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+# 预编译的 XPath 表达式
+_ROWS = XPath(f"//li[{has_class('clearfix')}]")
+_DATE_DIV = XPath(f".//div[{has_class('sj')}]")
+_CONTENT_DIV = XPath(f".//div[{has_class('wz')}]")
+_H2 = XPath(".//h2")
+_P = XPath(".//p")
+_A = XPath(".//a")
+
+def _parse_jwc_news(req: requests.Response) -> str:
+    tree = lxml.html.fromstring(req.content, parser=_PARSER)
+    news_list = _ROWS(tree)
+    result = []
+    for news in news_list:
+        try:
+            date_div = _DATE_DIV(news)[0]
+            day = _H2(date_div)[0].text_content().strip()
+            month_year = _P(date_div)[0].text_content().strip()
+            year, month = month_year.split('.')
+            date = f"{year}年{int(month)}月{int(day)}日"
+            content_div = _CONTENT_DIV(news)[0]
+            title = _H2(content_div)[0].text_content().strip()
+            link = _A(content_div)[0].get('href')
+            if link.startswith('..'):
+                link = 'https://jwc.sjtu.edu.cn' + link[2:]
+            summary = _P(content_div)[0].text_content().strip()
+            result.append(JwcRow(date, title, link, summary))
+        except Exception:
+            continue
+    output = '\n\n'.join(
+        [f"- [{item.title}]({item.link})\n{item.summary}\n{item.date}" for item in result]
+    )
+    return output
+
+def fetch_jwc_news(force_refresh: bool = False) -> Optional[str]:
+    """获取（可能来自缓存的）Markdown 格式新闻列表，页面请求失败时返回 None"""
+    return _CACHE.fetch(JWC_NEWS_URL, _parse_jwc_news, force_refresh, timeout=_TIMEOUT)
+
 @register_tool(
     name="jwc_news",
-    description="获取教务处面向学生的通知公告。",
+    description="获取教务处面向学生的通知公告。结果会缓存 5 分钟，参数 force_refresh 为 true 时忽略缓存重新获取。",
     require_login=False
 )
-def jwc_news(context: SJTUContext) -> dict:
-    pageUrl = 'https://jwc.sjtu.edu.cn/xwtg/tztg.htm'
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
+def jwc_news(context: SJTUContext, force_refresh: bool = False) -> dict:
     try:
-        req = requests.get(pageUrl, headers=headers)
-        if req.status_code != requests.codes.ok:
+        output = fetch_jwc_news(force_refresh)
+        if output is None:
             return {"success": False, "error": "获取信息失败，请检查网络连接"}
-        req.encoding = 'utf-8'
-        html = req.text
-        soup = BeautifulSoup(html, 'lxml')
-        news_list = soup.find_all('li', class_='clearfix')
-        result = []
-        for news in news_list:
-            try:
-                date_div = news.find('div', class_='sj')
-                day = date_div.find('h2').text.strip()
-                month_year = date_div.find('p').text.strip()
-                year, month = month_year.split('.')
-                date = f"{year}年{int(month)}月{int(day)}日"
-                title = news.find('div', class_='wz').find('h2').text.strip()
-                link = news.find('div', class_='wz').find('a').get('href')
-                if link.startswith('..'):
-                    link = 'https://jwc.sjtu.edu.cn' + link[2:]
-                summary = news.find('div', class_='wz').find('p').text.strip()
-                result.append({
-                    'date': date,
-                    'title': title,
-                    'link': link,
-                    'summary': summary
-                })
-            except Exception:
-                continue
-        output = '\n\n'.join(
-            [f"- [{item['title']}]({item['link']})\n{item['summary']}\n{item['date']}" for item in result]
-        )
         return {"success": True, "data": output}
     except Exception as e:
-        return {"success": False, "error": str(e)} 
\ No newline at end of file
+        return {"success": False, "error": str(e)}
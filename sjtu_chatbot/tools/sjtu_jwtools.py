@@ -1,4 +1,5 @@
 from ..mcp_server.server import register_tool, SJTUContext
+from ..mcp_server import json_utils
 import logging
 import requests
 
@@ -31,7 +32,7 @@ def sjtu_jw_request(context: SJTUContext, path: str) -> dict:
         resp = session.get(url, timeout=30)
         resp.raise_for_status()
         try:
-            data = resp.json()
+            data = json_utils.loads(resp.content)
         except ValueError:
             data = resp.text
         return {"success": True, "data": data}
@@ -1,64 +1,103 @@
 from ..mcp_server.server import register_tool, SJTUContext
 from urllib.parse import urljoin
 import requests
-from bs4 import BeautifulSoup
-from typing import Any, Dict, List, Tuple
+import lxml.html
+from lxml.etree import XPath
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from .base.http_utils import create_pooled_session, TTLPageCache
+from .base.xpath_utils import has_class
+
+# 模块级共享会话，跨调用复用到 news.sjtu.edu.cn 的连接
+_SESSION = create_pooled_session(pool_maxsize=20, retries=1)
+_SESSION.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+_SESSION.headers['Accept'] = 'text/html,*/*;q=0.9'
+
+# (连接超时, 读取超时)；会话只重试一次，站点无法连接时约 6 秒内失败
+_TIMEOUT = (3.05, 10)
+
+SJTU_NEWS_URL = 'https://news.sjtu.edu.cn/jdyw/index.html'
+
+# 页面解析结果缓存 5 分钟，过期后发条件请求
+_CACHE = TTLPageCache(_SESSION, ttl=300)
+
+class NewsRow(NamedTuple):
+    title: str
+    link: Optional[str]
+    imgLink: Optional[str]
+    detail: Optional[str]
+    time: Optional[str]
+    source: Optional[str]
+
+# 预编译的 XPath 表达式
+_LIST_CARD = XPath(f"//div[{has_class('list-card-h')}]")
+_ITEMS = XPath(f".//li[{has_class('item')}]")
+_CARD = XPath(f".//a[{has_class('card')}]")
+_IMG = XPath(".//img")
+_TITLE = XPath(f".//p[{has_class('dot')}]")
+# 原实现按完整的 class 字符串 'des dot' 查找，这里同样精确匹配，不用 has_class
+_DETAIL = XPath(".//div[@class='des dot']")
+_ABOUT = XPath(f".//div[{has_class('time')}]")
+_TIME = XPath(".//span")
+_SOURCE = XPath(f".//div[{has_class('source')}]//p")
+
+def _first(element, xpath: XPath):
+    """返回 XPath 匹配到的第一个元素，element 为 None 或没有匹配时返回 None"""
+    if element is None:
+        return None
+    found = xpath(element)
+    return found[0] if found else None
+
+def _text(element) -> Optional[str]:
+    """
+    返回元素的全部文本内容（含内联子元素中的文本），element 为 None 时返回 None
+
+    原 BeautifulSoup 实现取 .contents[0]，遇到 <b> 等内联标记时只保留其前面的文本，
+    这里改为完整文本，如 <p>新闻<b>三</b></p> 得到 "新闻三" 而不是 "新闻"。
+    """
+    return element.text_content() if element is not None else None
+
+def _parse_sjtu_news(req: requests.Response) -> str:
+    # 直接解析响应字节，由 lxml 根据页面 <meta charset> 识别编码
+    tree = lxml.html.fromstring(req.content)
+    news = _ITEMS(_LIST_CARD(tree)[0])
+    result = []
+    for n in news:
+        card = _first(n, _CARD)
+        title = _text(_first(card, _TITLE))
+        if title is None:
+            # 没有标题的条目无法生成有效的列表项，直接跳过
+            continue
+        link = card.get('href')
+        img = _first(card, _IMG)
+        imgLink = img.get('src') if img is not None else None
+        about = _first(card, _ABOUT)
+        result.append(NewsRow(
+            title=title,
+            link=urljoin(SJTU_NEWS_URL, link) if link else None,
+            imgLink=urljoin(SJTU_NEWS_URL, imgLink) if imgLink else None,
+            detail=_text(_first(card, _DETAIL)),
+            time=_text(_first(about, _TIME)),
+            source=_text(_first(about, _SOURCE))
+        ))
+    output = '\n\n'.join(
+        [f"- [{item.title}]({item.link})\n{item.detail}\n{item.time} 来自于 {item.source}" for item in result]
+    )
+    return output
+
+def fetch_sjtu_news(force_refresh: bool = False) -> Optional[str]:
+    """获取（可能来自缓存的）Markdown 格式新闻列表，页面请求失败时返回 None"""
+    return _CACHE.fetch(SJTU_NEWS_URL, _parse_sjtu_news, force_refresh, timeout=_TIMEOUT)
 
 @register_tool(
     name="sjtu_news",
-    description="获取交大新闻网的新闻。",
+    description="获取交大新闻网的新闻。结果会缓存 5 分钟，参数 force_refresh 为 true 时忽略缓存重新获取。",
     require_login=False
 )
-def sjtu_news(context: SJTUContext) -> dict:
-    pageUrl = 'https://news.sjtu.edu.cn/jdyw/index.html'
+def sjtu_news(context: SJTUContext, force_refresh: bool = False) -> dict:
     try:
-        req = requests.get(pageUrl)
-        if req.status_code != requests.codes.ok:
+        output = fetch_sjtu_news(force_refresh)
+        if output is None:
             return {"success": False, "error": "获取信息失败，请检查网络连接"}
-        html = req.text
-        html = BeautifulSoup(html, 'lxml')
-        news = html.find('div', class_='list-card-h').find_all('li', class_='item')
-        result = []
-        for n in news:
-            card = n.find('a', class_='card')
-            try:
-                link =  card.get('href')
-                link = urljoin(pageUrl, link)
-            except:
-                link = None
-            try:
-                imgLink = card.find('img').get('src')
-                imgLink = urljoin(pageUrl, imgLink)
-            except:
-                imgLink = None
-            try:
-                title = card.find('p', class_='dot').contents[0]
-            except:
-                title = None
-            try:
-                detail = card.find('div', class_='des dot').contents[0]
-            except:
-                detail = None
-            about = card.find('div', class_='time')
-            try:
-                time = about.find('span').contents[0]
-            except:
-                time = None
-            try:
-                source = about.find('div', class_='source').p.contents[0]
-            except:
-                source = None
-            result.append({
-                'title': title,
-                'link': link,
-                'imgLink': imgLink,
-                'detail': detail,
-                'time': time,
-                'source': source
-            })
-        output = '\n\n'.join(
-            [f"- [{item['title']}]({item['link']})\n{item['detail']}\n{item['time']} 来自于 {item['source']}" for item in result]
-        )
         return {"success": True, "data": output}
     except Exception as e:
-        return {"success": False, "error": str(e)} 
\ No newline at end of file
+        return {"success": False, "error": str(e)}
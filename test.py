@@ -32,17 +32,21 @@ def main():
     log_level = logging.DEBUG if args.debug else logging.INFO
     logging.basicConfig(level=log_level, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     
+    # 服务器监听的地址
+    host = "0.0.0.0"
+    
     # 检查端口是否被占用
+    # 在服务器将要监听的地址上试绑定端口；SO_REUSEADDR 避免残留的 TIME_WAIT 连接造成误报
     import socket
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    try:
-        s.bind(('0.0.0.0', args.port))
-        s.close()
-    except socket.error as e:
-        print(f"错误: 端口 {args.port} 已被占用，请关闭占用该端口的程序或使用其他端口。")
-        print(f"您可以使用 --port 参数指定其他端口，例如: python test.py --port 1897")
-        print(f"技术细节: {e}")
-        sys.exit(1)
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind((host, args.port))
+        except socket.error as e:
+            print(f"错误: 端口 {args.port} 已被占用，请关闭占用该端口的程序或使用其他端口。")
+            print(f"您可以使用 --port 参数指定其他端口，例如: python test.py --port 1897")
+            print(f"技术细节: {e}")
+            sys.exit(1)
     
     # 创建 MCP 服务器
     mcp_server = create_mcp_server()
@@ -80,12 +84,12 @@ def main():
     
     # 启动 MCP 服务器（在主线程中）
     try:
-        print(f"\n[MCP 服务器] 正在启动，端点: http://0.0.0.0:{args.port}/mcp")
+        print(f"\n[MCP 服务器] 正在启动，端点: http://{host}:{args.port}/mcp")
         print(f"[MCP 服务器] 浏览器测试: http://localhost:{args.port}/mcp")
         print(f"[MCP 服务器] Docker配置: http://host.docker.internal:{args.port}/mcp")
         
         # 启动服务器
-        mcp_server.run(host="0.0.0.0", port=args.port)
+        mcp_server.run(host=host, port=args.port)
     except KeyboardInterrupt:
         print("\n[MCP 服务器] 已被用户中断")
     except Exception as e: